@@ -1,11 +1,50 @@
 import click
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
+from opensanctions import settings
 from opensanctions.core import Dataset, Context, Entity, setup
-from opensanctions.core.export import export_global_index, write_object
-from opensanctions.core.http import cleanup_cache
+from opensanctions.core.http import cleanup_cache, get_session, get_download_session
+from opensanctions.model import db
 from opensanctions.model.base import migrate_db
 
+WORKERS_HELP = "Parallel crawlers (these bypass the HTTP response cache)"
+
+
+def _init_worker():
+    # Each worker process opens its own HTTP sessions. They bypass the
+    # response cache: concurrent writers would lock its SQLite database.
+    settings.HTTP_CACHE = False
+    get_session.cache_clear()
+    get_download_session.cache_clear()
+
+
+def _crawl_source(name):
+    Context(Dataset.get(name)).crawl()
+
+
+def crawl_sources(sources, workers=1):
+    """Crawl the given sources, using a pool of worker processes if more than
+    one worker is requested. Workers do not use the HTTP response cache. SQLite
+    does not support concurrent writers, so sources are always crawled
+    sequentially there."""
+    names = [source.name for source in sources]
+    if workers < 2 or db.engine.dialect.name == "sqlite":
+        for name in names:
+            _crawl_source(name)
+        return
+
+    # Forked workers must not share pooled database connections with the
+    # parent process, each of them connects on first use:
+    db.engine.dispose()
+    mp_context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=mp_context, initializer=_init_worker
+    ) as pool:
+        for _ in pool.map(_crawl_source, names):
+            pass
+
 
 @click.group(help="OpenSanctions ETL toolkit")
 @click.option("-v", "--verbose", is_flag=True, default=False)
@@ -23,6 +62,8 @@ def cli(verbose=False, quiet=False):
 @click.argument("dataset", default=Dataset.ALL, type=click.Choice(Dataset.names()))
 @click.option("-o", "--outfile", type=click.File("w"), default="-")
 def dump_dataset(dataset, outfile):
+    from opensanctions.core.export import write_object
+
     dataset = Dataset.get(dataset)
     for entity in Entity.query(dataset):
         write_object(outfile, entity)
@@ -30,15 +71,17 @@ def dump_dataset(dataset, outfile):
 
 @cli.command("crawl", help="Crawl entities into the given dataset")
 @click.argument("dataset", default=Dataset.ALL, type=click.Choice(Dataset.names()))
-def crawl(dataset):
+@click.option("-w", "--workers", type=int, default=1, help=WORKERS_HELP)
+def crawl(dataset, workers):
     dataset = Dataset.get(dataset)
-    for source in dataset.sources:
-        Context(source).crawl()
+    crawl_sources(dataset.sources, workers=workers)
 
 
 @cli.command("export", help="Export entities from the given dataset")
 @click.argument("dataset", default=Dataset.ALL, type=click.Choice(Dataset.names()))
 def export(dataset):
+    from opensanctions.core.export import export_global_index
+
     dataset = Dataset.get(dataset)
     for dataset_ in dataset.datasets:
         context = Context(dataset_)
@@ -48,10 +91,12 @@ def export(dataset):
 
 @cli.command("run", help="Run the full process for the given dataset")
 @click.argument("dataset", default=Dataset.ALL, type=click.Choice(Dataset.names()))
-def run(dataset):
+@click.option("-w", "--workers", type=int, default=1, help=WORKERS_HELP)
+def run(dataset, workers):
+    from opensanctions.core.export import export_global_index
+
     dataset = Dataset.get(dataset)
-    for source in dataset.sources:
-        Context(source).crawl()
+    crawl_sources(dataset.sources, workers=workers)
     for dataset_ in dataset.datasets:
         context = Context(dataset_)
         context.export()
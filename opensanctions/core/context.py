@@ -1,14 +1,57 @@
+import sys
+import mmap
+import logging
 import hashlib
-import mimetypes
 import structlog
+from functools import lru_cache
 from lxml import etree
 from datapatch import LookupException
 from structlog.contextvars import clear_contextvars, bind_contextvars
 
 from opensanctions import settings
 from opensanctions.model import db, Statement, Issue, Resource
+from opensanctions.model.resource import CHECKSUM_PREFIX
 from opensanctions.core.http import get_session, fetch_download
-from opensanctions.core.export import export_dataset
+
+
+def _checksum_digest():
+    # BLAKE2b is considerably faster than SHA-1 in software; a 20 byte digest
+    # keeps the hex digest the same length as before.
+    return hashlib.blake2b(digest_size=20)
+
+
+@lru_cache(maxsize=None)
+def _guess_mime_type(suffixes):
+    """Guess the MIME type for a file extension, e.g. `.csv`."""
+    import mimetypes
+
+    mime_type, _ = mimetypes.guess_type("resource%s" % suffixes)
+    return mime_type
+
+
+def _file_checksum(fh):
+    """Compute the checksum of an open binary file."""
+    try:
+        # Hash straight out of the page cache, without copying the file into
+        # Python buffers chunk by chunk.
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            digest = _checksum_digest()
+            digest.update(mm)
+            return digest.hexdigest()
+    except (ValueError, OSError):
+        # Empty files and some special files cannot be mapped.
+        pass
+    if sys.version_info >= (3, 11):
+        return hashlib.file_digest(fh, _checksum_digest).hexdigest()
+    digest = _checksum_digest()
+    while True:
+        chunk = fh.read(65536)
+        if not chunk:
+            break
+        digest.update(chunk)
+    return digest.hexdigest()
 
 
 class Context(object):
@@ -22,7 +65,11 @@ class Context(object):
         self.path = settings.DATASET_PATH.joinpath(dataset.name)
         self.http = get_session()
         self.log = structlog.get_logger(dataset.name)
-        self._statements = {}
+        self._log_emits = logging.getLogger(dataset.name).isEnabledFor(logging.DEBUG)
+        self._statements = []
+        self._resources = []
+        self._lookup_value_cache = lru_cache(maxsize=8192)(self._lookup_value)
+        self._lookup_cache = lru_cache(maxsize=8192)(self._lookup)
 
     def get_resource_path(self, name):
         return self.path.joinpath(name)
@@ -37,37 +84,61 @@ class Context(object):
 
     def parse_resource_xml(self, name):
         """Parse a file in the resource folder into an XML tree."""
-        file_path = self.get_resource_path(name)
-        with open(file_path, "rb") as fh:
-            return etree.parse(fh)
+        # libxml2 reads the file natively when given a path, rather than
+        # pulling small chunks through a Python file object:
+        file_path = self.get_resource_path(name).as_posix()
+        return etree.parse(file_path)
+
+    def parse_resource_xml_stream(self, name, tag):
+        """Iterate over the elements with the given tag (or tags) in an XML file
+        in the resource folder. Each element is discarded once the caller moves
+        on, so memory use stays flat even for very large files."""
+        file_path = self.get_resource_path(name).as_posix()
+        events = etree.iterparse(file_path, events=("end",), tag=tag, huge_tree=True)
+        for _, elem in events:
+            yield elem
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
 
     def export_resource(self, path, mime_type=None, title=None):
         """Register a file as a documented file exported by the dataset."""
         if mime_type is None:
-            mime_type, _ = mimetypes.guess(path)
+            mime_type = _guess_mime_type("".join(path.suffixes))
 
-        digest = hashlib.sha1()
-        size = 0
+        size = path.stat().st_size
         with open(path, "rb") as fh:
-            while True:
-                chunk = fh.read(65536)
-                if not chunk:
-                    break
-                size += len(chunk)
-                digest.update(chunk)
-        checksum = digest.hexdigest()
-        rel_path = path.relative_to(self.path).as_posix()
-        Resource.save(rel_path, self.dataset, checksum, mime_type, size, title)
-
-    def lookup_value(self, lookup, value, default=None):
+            checksum = "%s:%s" % (CHECKSUM_PREFIX, _file_checksum(fh))
+        resource = {
+            "path": path.relative_to(self.path).as_posix(),
+            "checksum": checksum,
+            "mime_type": mime_type,
+            "size": size,
+            "title": title,
+        }
+        self._resources.append(resource)
+
+    def flush_resources(self):
+        """Store the resources registered via `export_resource` in the
+        database in one batch."""
+        Resource.save_many(self.dataset, self._resources)
+        self._resources = []
+
+    def _lookup_value(self, lookup, value, default):
         try:
             return self.dataset.lookups[lookup].get_value(value, default=default)
         except LookupException:
             return default
 
-    def lookup(self, lookup, value):
+    def lookup_value(self, lookup, value, default=None):
+        return self._lookup_value_cache(lookup, value, default)
+
+    def _lookup(self, lookup, value):
         return self.dataset.lookups[lookup].match(value)
 
+    def lookup(self, lookup, value):
+        return self._lookup_cache(lookup, value)
+
     def make(self, schema, target=False):
         """Make a new entity with some dataset context set."""
         return self.dataset.make_entity(schema, target=target)
@@ -78,8 +149,12 @@ class Context(object):
         context is flushed to the store. All statements that are not flushed
         when a crawl is aborted are not persisted to the database."""
         self.log.debug("Flushing statements to database...")
-        Statement.upsert_many(list(self._statements.values()))
-        self._statements = {}
+        # De-duplicate the batch, an upsert cannot touch the same row twice:
+        statements = {
+            (s["entity_id"], s["prop"], s["value"]): s for s in self._statements
+        }
+        Statement.upsert_many(statements.values())
+        self._statements.clear()
 
     def emit(self, entity, target=None, unique=False):
         """Send an FtM entity to the store."""
@@ -88,14 +163,13 @@ class Context(object):
         if target is not None:
             entity.target = target
         statements = Statement.from_entity(entity, unique=unique)
-        if not len(statements):
+        if not statements:
             raise ValueError("Entity has no properties: %r", entity)
-        for stmt in statements:
-            key = (stmt["entity_id"], stmt["prop"], stmt["value"])
-            self._statements[key] = stmt
+        self._statements.extend(statements)
         if len(self._statements) > 50000:
             self.flush()
-        self.log.debug("Emitted", entity=entity)
+        if self._log_emits:
+            self.log.debug("Emitted", entity_id=entity.id)
 
     def bind(self):
         bind_contextvars(dataset=self.dataset.name)
@@ -109,11 +183,8 @@ class Context(object):
             # Run the dataset:
             self.dataset.method(self)
             self.flush()
-            self.log.info(
-                "Crawl completed",
-                entities=Statement.all_counts(dataset=self.dataset),
-                targets=Statement.all_counts(dataset=self.dataset, target=True),
-            )
+            entities, targets = Statement.all_target_counts(dataset=self.dataset)
+            self.log.info("Crawl completed", entities=entities, targets=targets)
         except KeyboardInterrupt:
             db.session.rollback()
             raise
@@ -128,6 +199,8 @@ class Context(object):
 
     def export(self):
         """Generate exported files for the dataset."""
+        from opensanctions.core.export import export_dataset
+
         try:
             self.bind()
             export_dataset(self, self.dataset)
@@ -142,5 +215,12 @@ class Context(object):
 
     def close(self):
         """Flush and tear down the context."""
+        try:
+            self.flush_resources()
+        except Exception:
+            db.session.rollback()
+            self.log.exception("Could not store exported resources")
+        self._lookup_value_cache.cache_clear()
+        self._lookup_cache.cache_clear()
         clear_contextvars()
         db.session.commit()
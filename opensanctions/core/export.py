@@ -164,6 +164,7 @@ def export_dataset(context, dataset):
     # context.export_resource(wide_path, mime_type="text/csv", title=title)
 
     # Make sure the exported resources are visible in the database
+    context.flush_resources()
     db.session.flush()
 
     # Export list of data issues from crawl stage
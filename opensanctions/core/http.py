@@ -1,6 +1,8 @@
 import requests
 import structlog
 import functools
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
 from requests_cache.core import CachedSession
 
 from opensanctions import settings
@@ -9,12 +11,32 @@ log = structlog.get_logger("http")
 HEADERS = {"User-Agent": settings.USER_AGENT}
 
 
-def get_session():
-    """Make a cached session."""
-    settings.CACHE_PATH.mkdir(exist_ok=True, parents=True)
-    path = settings.CACHE_PATH.joinpath("http").as_posix()
-    session = CachedSession(cache_name=path, expire_after=settings.CACHE_EXPIRE)
+def _configure_session(session):
+    """Pool connections and retry transient server errors."""
+    retries = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
     session.headers.update(HEADERS)
+    return session
+
+
+@functools.lru_cache(maxsize=None)
+def get_session():
+    """Make a cached session, shared by all crawlers in the process. If the
+    HTTP cache is disabled, a plain session is returned instead."""
+    if settings.HTTP_CACHE:
+        settings.CACHE_PATH.mkdir(exist_ok=True, parents=True)
+        path = settings.CACHE_PATH.joinpath("http").as_posix()
+        session = CachedSession(cache_name=path, expire_after=settings.CACHE_EXPIRE)
+    else:
+        session = requests.Session()
+    _configure_session(session)
     # weird monkey-patch: default timeout for requests sessions
     session.request = functools.partial(session.request, timeout=settings.HTTP_TIMEOUT)
     return session
@@ -26,10 +48,15 @@ def cleanup_cache():
     session.cache.remove_expired_responses(expire_after=settings.CACHE_EXPIRE)
 
 
+@functools.lru_cache(maxsize=None)
+def get_download_session():
+    """Make an uncached session for downloading large files."""
+    return _configure_session(requests.Session())
+
+
 def fetch_download(file_path, url):
     """Circumvent the cache for large file downloads."""
-    session = requests.Session()
-    session.headers.update(HEADERS)
+    session = get_download_session()
     log.info("Fetching resource", path=file_path.as_posix(), url=url)
     file_path.parent.mkdir(exist_ok=True, parents=True)
     with session.get(url, stream=True, timeout=settings.HTTP_TIMEOUT) as res:
@@ -47,6 +47,8 @@ def configure_logging(level=logging.DEBUG):
     structlog.configure(
         processors=processors,
         logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
     )
 
     handler = logging.StreamHandler(sys.stderr)
@@ -87,6 +87,5 @@ def parse_entry(context, entry):
 
 def crawl(context):
     context.fetch_resource("source.xml", context.dataset.data.url)
-    doc = context.parse_resource_xml("source.xml")
-    for entry in doc.findall(".//acount-list"):
+    for entry in context.parse_resource_xml_stream("source.xml", "acount-list"):
         parse_entry(context, entry)
@@ -144,10 +144,9 @@ def parse_common(context, entity, node):
 
 def crawl(context):
     context.fetch_resource("source.xml", context.dataset.data.url)
-    doc = context.parse_resource_xml("source.xml")
-
-    for node in doc.findall(".//INDIVIDUAL"):
-        parse_individual(context, node)
-
-    for node in doc.findall(".//ENTITY"):
-        parse_entity(context, node)
+    tags = ("INDIVIDUAL", "ENTITY")
+    for node in context.parse_resource_xml_stream("source.xml", tags):
+        if node.tag == "INDIVIDUAL":
+            parse_individual(context, node)
+        else:
+            parse_entity(context, node)
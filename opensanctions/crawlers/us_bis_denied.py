@@ -1,21 +1,29 @@
 import csv
+from functools import lru_cache
 from prefixdate import parse_format
 
 from opensanctions.helpers import make_address, make_sanction
 
 
+@lru_cache(maxsize=None)
 def parse_date(text):
     return parse_format(text, "%m/%d/%Y")
 
 
 def parse_row(context, row):
+    name = row.get("Name")
+    country = row.get("Country")
+    effective_date = row.get("Effective_Date")
+    last_update = row.get("Last_Update")
+    citation = row.get("FR_Citation")
+
     entity = context.make("LegalEntity")
-    entity.make_slug(row.get("Effective_Date"), row.get("Name"))
-    entity.add("name", row.get("Name"))
+    entity.make_slug(effective_date, name)
+    entity.add("name", name)
     entity.add("notes", row.get("Action"))
-    entity.add("country", row.get("Country"))
-    entity.add("modifiedAt", row.get("Last_Update"))
-    entity.context["updated_at"] = row.get("Last_Update")
+    entity.add("country", country)
+    entity.add("modifiedAt", last_update)
+    entity.context["updated_at"] = last_update
 
     address = make_address(
         context,
@@ -23,23 +31,23 @@ def parse_row(context, row):
         postal_code=row.get("Postal_Code"),
         city=row.get("City"),
         region=row.get("State"),
-        country=row.get("Country"),
+        country=country,
     )
     if address is not None:
         entity.add("addressEntity", address)
         context.emit(address, target=True)
     context.emit(entity, target=True)
 
-    sanction = make_sanction(entity, key=row.get("FR_Citation"))
-    sanction.add("program", row.get("FR_Citation"))
-    sanction.add("startDate", parse_date(row.get("Effective_Date")))
+    sanction = make_sanction(entity, key=citation)
+    sanction.add("program", citation)
+    sanction.add("startDate", parse_date(effective_date))
     sanction.add("endDate", parse_date(row.get("Expiration_Date")))
     # pprint(row)
     context.emit(sanction)
 
 
 def crawl(context):
-    context.fetch_resource("dpl.tsv", context.dataset.data.url)
-    with open(context.get_resource_path("dpl.tsv"), "r") as csvfile:
+    path = context.fetch_resource("dpl.tsv", context.dataset.data.url)
+    with open(path, "r", encoding="utf-8", newline="") as csvfile:
         for row in csv.DictReader(csvfile, delimiter="\t"):
             parse_row(context, row)
@@ -9,6 +9,13 @@ def get_formatter():
     return AddressFormatter()
 
 
+@lru_cache(maxsize=4096)
+def format_line(country, parts):
+    """Format address parts (a tuple of key/value pairs) as a single line.
+    Many addresses share the same components, so the result is cached."""
+    return get_formatter().one_line(dict(parts), country=country)
+
+
 def make_address(
     context,
     full=None,
@@ -54,7 +61,7 @@ def make_address(
             "country": country,
         }
         cc = address.first("country")
-        full = get_formatter().one_line(data, country=cc)
+        full = format_line(cc, tuple(data.items()))
         address.add("full", full)
 
     if not address.has("full"):
@@ -0,0 +1,31 @@
+"""Tag resource checksums with their hash algorithm.
+
+Revision ID: 3b0c1a5e6f2d
+Revises: dc9369e80cf7
+Create Date: 2021-07-08 09:12:44.281903
+
+"""
+from alembic import op
+
+
+revision = "3b0c1a5e6f2d"
+down_revision = "dc9369e80cf7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "UPDATE resource SET checksum = 'sha1:' || checksum "
+        "WHERE checksum NOT LIKE '%:%'"
+    )
+
+
+def downgrade():
+    # BLAKE2b checksums cannot be expressed as SHA-1, those resources are
+    # registered again on the next export.
+    op.execute("DELETE FROM resource WHERE checksum LIKE 'b2:%'")
+    op.execute(
+        "UPDATE resource SET checksum = substr(checksum, 6) "
+        "WHERE checksum LIKE 'sha1:%'"
+    )
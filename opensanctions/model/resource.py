@@ -5,6 +5,12 @@ from opensanctions import settings
 from opensanctions.model.base import Base, db
 
 
+# Checksums are stored as `<prefix>:<hex>`, where the prefix names the hash
+# algorithm. New checksums are BLAKE2b digests, older ones SHA-1.
+CHECKSUM_PREFIX = "b2"
+CHECKSUM_ALGORITHMS = {CHECKSUM_PREFIX: "blake2b", "sha1": "sha1"}
+
+
 class Resource(Base):
     __tablename__ = "resource"
 
@@ -17,21 +23,23 @@ class Resource(Base):
     title = Column(Unicode, nullable=True)
 
     @classmethod
-    def save(cls, path, dataset, checksum, mime_type, size, title):
-        q = db.session.query(cls)
-        q = q.filter(cls.dataset == dataset.name)
-        q = q.filter(cls.path == path)
-        resource = q.first()
-        if resource is None:
-            resource = cls()
-            resource.dataset = dataset.name
-            resource.path = path
-        resource.mime_type = mime_type
-        resource.checksum = checksum
-        resource.timestamp = settings.RUN_TIME
-        resource.size = size
-        resource.title = title
-        db.session.add(resource)
+    def save_many(cls, dataset, resources):
+        """Store a batch of resources exported by the dataset, replacing any
+        previously recorded versions of the same files."""
+        resources = {r["path"]: r for r in resources}
+        if not len(resources):
+            return
+        pq = db.session.query(cls)
+        pq = pq.filter(cls.dataset == dataset.name)
+        pq = pq.filter(cls.path.in_(list(resources.keys())))
+        pq.delete(synchronize_session=False)
+        rows = []
+        for resource in resources.values():
+            row = dict(resource)
+            row["dataset"] = dataset.name
+            row["timestamp"] = settings.RUN_TIME
+            rows.append(row)
+        db.session.execute(cls.__table__.insert(), rows)
 
     @classmethod
     def clear(cls, dataset):
@@ -49,9 +57,11 @@ class Resource(Base):
 
     def to_dict(self):
         mime = parse_mimetype(self.mime_type)
-        return {
+        prefix, _, digest = self.checksum.partition(":")
+        data = {
             "path": self.path,
-            "sha1": self.checksum,
+            "checksum": digest,
+            "checksum_algorithm": CHECKSUM_ALGORITHMS[prefix],
             "timestamp": self.timestamp,
             # "dataset": self.dataset,
             "mime_type": self.mime_type,
@@ -59,3 +69,7 @@ class Resource(Base):
             "size": self.size,
             "title": self.title,
         }
+        # Legacy key, published for as long as SHA-1 checksums remain:
+        if prefix == "sha1":
+            data["sha1"] = digest
+        return data
@@ -1,12 +1,18 @@
+import io
+import sys
+import csv
 from followthemoney.types import registry
-from sqlalchemy import func, Column, Unicode, DateTime, Boolean
+from sqlalchemy import func, case, Column, Unicode, DateTime, Boolean
 from sqlalchemy.dialects.sqlite import insert as insert_sqlite
-from sqlalchemy.dialects.postgresql import insert as insert_postgresql
 
 
 from opensanctions import settings
 from opensanctions.model.base import Base, db, ENTITY_ID_LEN
 
+# Property types with a small vocabulary of values that repeat across many
+# entities, so statements can share one string object per value:
+INTERNED_TYPES = (registry.country, registry.date, registry.gender, registry.topic)
+
 
 class Statement(Base):
     """A single statement about a property relevant to an entity.
@@ -34,16 +40,22 @@ class Statement(Base):
 
     @classmethod
     def from_entity(cls, entity, unique=False):
+        entity_id = entity.id
+        schema = entity.schema.name
+        dataset = entity.dataset.name
+        target = entity.target
         values = []
         for prop, value in entity.itervalues():
+            if prop.type in INTERNED_TYPES:
+                value = sys.intern(value)
             stmt = {
-                "entity_id": entity.id,
+                "entity_id": entity_id,
                 "prop": prop.name,
                 "prop_type": prop.type.name,
-                "schema": entity.schema.name,
+                "schema": schema,
                 "value": value,
-                "dataset": entity.dataset.name,
-                "target": entity.target,
+                "dataset": dataset,
+                "target": target,
                 "unique": unique,
                 "first_seen": settings.RUN_TIME,
                 "last_seen": settings.RUN_TIME,
@@ -53,14 +65,14 @@ class Statement(Base):
 
     @classmethod
     def upsert_many(cls, values):
+        """Insert or update a sized collection of statement dicts."""
         if not len(values):
             return
 
-        upsert = insert_sqlite
         if db.engine.dialect.name == "postgresql":
-            upsert = insert_postgresql
+            return cls._upsert_copy(values)
 
-        istmt = upsert(cls.__table__).values(values)
+        istmt = insert_sqlite(cls.__table__).values(list(values))
         stmt = istmt.on_conflict_do_update(
             index_elements=["entity_id", "prop", "value", "dataset"],
             set_=dict(
@@ -73,6 +85,38 @@ class Statement(Base):
         )
         db.session.execute(stmt)
 
+    @classmethod
+    def _upsert_copy(cls, values):
+        """Stream the statements into a temporary table using COPY, then merge
+        them into the statement table with a single INSERT ... ON CONFLICT."""
+        columns = [c.name for c in cls.__table__.columns]
+        names = ", ".join('"%s"' % c for c in columns)
+        updates = ("schema", "prop_type", "target", "unique", "last_seen")
+        updates = ", ".join('"%s" = EXCLUDED."%s"' % (c, c) for c in updates)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        for value in values:
+            writer.writerow([value.get(c) for c in columns])
+        buffer.seek(0)
+
+        cursor = db.session.connection().connection.cursor()
+        try:
+            cursor.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS statement_upsert "
+                "(LIKE statement INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+            copy = "COPY statement_upsert (%s) FROM STDIN WITH (FORMAT csv)"
+            cursor.copy_expert(copy % names, buffer)
+            cursor.execute(
+                "INSERT INTO statement (%s) SELECT %s FROM statement_upsert "
+                "ON CONFLICT (entity_id, prop, value, dataset) DO UPDATE SET %s"
+                % (names, names, updates)
+            )
+            cursor.execute("TRUNCATE statement_upsert")
+        finally:
+            cursor.close()
+
     @classmethod
     def all_entity_ids(cls, dataset=None, unique=None, target=None):
         q = db.session.query(cls.entity_id)
@@ -100,6 +144,20 @@ class Statement(Base):
         q = cls.all_entity_ids(dataset=dataset, unique=unique, target=target)
         return q.count()
 
+    @classmethod
+    def all_target_counts(cls, dataset=None):
+        """Return the number of entities and the number of targets in a single
+        query."""
+        targets = case((cls.target == True, cls.entity_id))  # noqa
+        q = db.session.query(
+            func.count(func.distinct(cls.entity_id)),
+            func.count(func.distinct(targets)),
+        )
+        if dataset is not None:
+            q = q.filter(cls.dataset.in_(dataset.source_names))
+        entities, targets = q.one()
+        return entities, targets
+
     @classmethod
     def agg_target_by_country(cls, dataset=None):
         """Return the number of targets grouped by country."""
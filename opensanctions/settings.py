@@ -12,6 +12,10 @@ INTERVAL = 84600
 # HTTP cache expiry may last multiple runs
 CACHE_EXPIRE = INTERVAL * 7
 
+# Keep HTTP responses in the cache. This is turned off in parallel crawl
+# workers, which cannot share the SQLite-backed cache safely.
+HTTP_CACHE = True
+
 # All data storage (e.g. a Docker volume mount)
 DATA_PATH = Path.cwd().joinpath("data")
 DATA_PATH = env.get("OPENSANCTIONS_DATA_PATH", DATA_PATH)
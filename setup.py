@@ -15,7 +15,7 @@ setup(
     install_requires=[
         "followthemoney >= 1.21.2",
         "pantomime",
-        "sqlalchemy",
+        "sqlalchemy >= 1.4, < 2.0",
         "alembic",
         "addressformatting",
         "prefixdate",